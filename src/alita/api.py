@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 
 import httpx
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 
 from .browser_pool import BrowserPool
 from .config import settings
@@ -12,12 +13,21 @@ from .service import aggregate_headers, browser_flow, plain_flow
 
 
 def create_app() -> FastAPI:
-    session_store = SessionStore()
+    session_store = SessionStore(settings.max_sessions)
     browser_pool = BrowserPool(settings)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
-        client = httpx.AsyncClient(follow_redirects=True, timeout=settings.http_timeout)
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=settings.http_timeout,
+            http2=settings.http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
         app.state.http_client = client
         try:
             yield
@@ -25,14 +35,13 @@ def create_app() -> FastAPI:
             await client.aclose()
             await browser_pool.shutdown()
 
-    app = FastAPI(title="alita", lifespan=lifespan)
+    app = FastAPI(title="alita", lifespan=lifespan, default_response_class=ORJSONResponse)
 
     @app.post("/get")
     async def fetch_endpoint(payload: FetchRequest, request: Request):
         client: httpx.AsyncClient = request.app.state.http_client
         domain = domain_from_url(str(payload.url))
-        state = await session_store.get_state(domain)
-        async with state.lock:
+        async with session_store.session(domain) as state:
             if not state.initialized:
                 result = await browser_flow(payload, state, domain, browser_pool, settings)
                 state.initialized = True
@@ -41,6 +50,7 @@ def create_app() -> FastAPI:
             state.cookies = result.cookies
             if result.used_browser:
                 state.request_headers = dict(result.request_headers)
+                state.sanitized_headers = None
             return {
                 "status_code": result.status_code,
                 "used_browser": result.used_browser,
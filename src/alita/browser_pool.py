@@ -3,6 +3,8 @@ from __future__ import annotations
 import asyncio
 import contextlib
 import time
+import weakref
+from collections import OrderedDict
 from collections.abc import Sequence
 from contextlib import asynccontextmanager
 
@@ -13,6 +15,8 @@ from .config import Settings
 from .cookies import cookie_state_to_param, cookie_state_from_cdp, cookie_matches
 from .models import CookieState
 
+TAB_RESET_TIMEOUT = 5.0
+
 
 class BrowserManager:
     def __init__(self, config: Settings, domain: str) -> None:
@@ -21,8 +25,12 @@ class BrowserManager:
         self._browser: Browser | None = None
         self._lock = asyncio.Lock()
         self._active_tabs = 0
+        self._idle_tabs: list[Tab] = []
+        self._reserved_idle_tabs = 0
         self._last_used = 0.0
+        self._retired = False
         self._shutdown_task: asyncio.Task[None] | None = None
+        self._release_tasks: set[asyncio.Task[None]] = set()
 
     @property
     def domain(self) -> str:
@@ -31,32 +39,67 @@ class BrowserManager:
     @asynccontextmanager
     async def tab(self, cookies: Sequence[CookieState], url: str):
         tab = await self._acquire_tab(cookies, url)
+        reusable = False
         try:
             yield tab
+            reusable = True
         finally:
-            await self._release_tab(tab)
+            if reusable:
+                # Resetting a tab for reuse costs CDP round-trips; keep them off the response path.
+                task = asyncio.create_task(self._release_tab(tab, reusable))
+                self._release_tasks.add(task)
+                task.add_done_callback(self._release_tasks.discard)
+            else:
+                await self._release_tab(tab, reusable)
 
     async def _acquire_tab(self, cookies: Sequence[CookieState], url: str) -> Tab:
         async with self._lock:
             browser = await self._ensure_browser()
             self._active_tabs += 1
-        tab = await browser.get("about:blank", new_tab=True)
-        await _enable_default_domains(tab)
+            tab = self._idle_tabs.pop() if self._idle_tabs else None
+        if tab is None:
+            tab = await browser.get("about:blank", new_tab=True)
+            await _enable_default_domains(tab)
         if cookies:
             params = [cookie_state_to_param(cookie, url) for cookie in cookies]
             await browser.cookies.set_all(params)
         return tab
 
-    async def _release_tab(self, tab: Tab) -> None:
-        try:
-            await tab.close()
-        except Exception:
-            pass
+    async def _release_tab(self, tab: Tab, reusable: bool) -> None:
+        # Tabs from failed requests may be mid-navigation or intercepted, so only
+        # recycle after success, and only if an idle slot is free.
+        reserved = False
+        if reusable:
+            async with self._lock:
+                idle = len(self._idle_tabs) + self._reserved_idle_tabs
+                if self._browser and not self._retired and idle < self._config.browser_idle_tabs:
+                    self._reserved_idle_tabs += 1
+                    reserved = True
+        recycled = False
+        if reserved:
+            try:
+                await asyncio.wait_for(_reset_tab(tab), TAB_RESET_TIMEOUT)
+                recycled = True
+            except Exception:
+                pass
+        if not recycled:
+            try:
+                await tab.close()
+            except Exception:
+                pass
         async with self._lock:
+            if reserved:
+                self._reserved_idle_tabs -= 1
+                if recycled and self._browser:
+                    self._idle_tabs.append(tab)
             self._active_tabs = max(0, self._active_tabs - 1)
             self._last_used = time.monotonic()
             if self._active_tabs == 0:
-                self._schedule_shutdown()
+                if self._retired:
+                    if self._browser:
+                        await self._stop_browser()
+                else:
+                    self._schedule_shutdown()
 
     async def _ensure_browser(self) -> Browser:
         if self._browser:
@@ -92,20 +135,37 @@ class BrowserManager:
                     time.monotonic() - self._last_used >= self._config.browser_idle_shutdown_seconds
                 )
                 if self._browser and self._active_tabs == 0 and idle:
-                    await self._browser.stop()
-                    self._browser = None
+                    await self._stop_browser()
         except asyncio.CancelledError:
             raise
 
+    async def retire(self) -> None:
+        # Evicted from the pool: stop now if idle, otherwise when the last tab is released.
+        await self._cancel_idle_shutdown()
+        async with self._lock:
+            self._retired = True
+            if self._browser and self._active_tabs == 0:
+                await self._stop_browser()
+
     async def shutdown(self) -> None:
+        await self._cancel_idle_shutdown()
+        async with self._lock:
+            if self._browser:
+                await self._stop_browser()
+        await asyncio.gather(*self._release_tasks, return_exceptions=True)
+
+    async def _cancel_idle_shutdown(self) -> None:
         if self._shutdown_task:
             self._shutdown_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await self._shutdown_task
-        async with self._lock:
-            if self._browser:
-                await self._browser.stop()
-                self._browser = None
+            self._shutdown_task = None
+
+    async def _stop_browser(self) -> None:
+        # Idle tabs belong to the browser being stopped and close along with it.
+        self._idle_tabs.clear()
+        await self._browser.stop()
+        self._browser = None
 
     async def export_cookies(self, url: str) -> list[CookieState]:
         browser = self._browser
@@ -115,28 +175,63 @@ class BrowserManager:
         return [cookie_state_from_cdp(cookie) for cookie in cdp_cookies if cookie_matches(cookie, url)]
 
 
+BROWSER_POOL_SHARDS = 32
+
+
 class BrowserPool:
     def __init__(self, config: Settings) -> None:
         self._config = config
-        self._managers: dict[str, BrowserManager] = {}
-        self._lock = asyncio.Lock()
+        self._managers: OrderedDict[str, BrowserManager] = OrderedDict()
+        self._shards = [asyncio.Lock() for _ in range(BROWSER_POOL_SHARDS)]
+        self._shutdown_lock = asyncio.Lock()
+        self._eviction_tasks: set[asyncio.Task[None]] = set()
+        # Evicted managers may still be held by in-flight requests that can restart their browser.
+        self._retired_managers: weakref.WeakSet[BrowserManager] = weakref.WeakSet()
 
     async def get(self, domain: str) -> BrowserManager:
-        async with self._lock:
+        manager = self._managers.get(domain)
+        if manager is not None:
+            self._managers.move_to_end(domain)
+            return manager
+        async with self._shards[hash(domain) & (BROWSER_POOL_SHARDS - 1)]:
             manager = self._managers.get(domain)
             if manager is None:
                 manager = BrowserManager(self._config, domain)
                 self._managers[domain] = manager
+                self._evict_overflow()
             return manager
 
+    def _evict_overflow(self) -> None:
+        while len(self._managers) > self._config.max_sessions:
+            _, evicted = self._managers.popitem(last=False)
+            self._retired_managers.add(evicted)
+            task = asyncio.create_task(evicted.retire())
+            self._eviction_tasks.add(task)
+            task.add_done_callback(self._eviction_tasks.discard)
+
     async def shutdown(self) -> None:
-        async with self._lock:
-            managers = list(self._managers.values())
+        async with self._shutdown_lock:
+            managers = [*self._managers.values(), *self._retired_managers]
             self._managers.clear()
-        await asyncio.gather(*(manager.shutdown() for manager in managers), return_exceptions=True)
+            evictions = list(self._eviction_tasks)
+        await asyncio.gather(
+            *(manager.shutdown() for manager in managers),
+            *evictions,
+            return_exceptions=True,
+        )
 
 
 async def _enable_default_domains(tab: Tab) -> None:
-    await tab.send(cdp.network.enable())
-    await tab.send(cdp.page.enable())
-    await tab.send(cdp.dom.enable())
+    await asyncio.gather(
+        tab.send(cdp.network.enable()),
+        tab.send(cdp.page.enable()),
+        tab.send(cdp.dom.enable()),
+    )
+
+
+async def _reset_tab(tab: Tab) -> None:
+    # A new tab starts with empty sessionStorage and history. Cookies, localStorage and
+    # IndexedDB are profile-wide, so a new tab would share those anyway.
+    await tab.send(cdp.runtime.evaluate("sessionStorage.clear()"))
+    await tab.send(cdp.page.navigate("about:blank"))
+    await tab.send(cdp.page.reset_navigation_history())
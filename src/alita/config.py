@@ -20,9 +20,17 @@ class Settings:
     browser_idle_shutdown_seconds: float = float(
         os.getenv("ALITA_BROWSER_IDLE_SECONDS", "10")
     )
+    browser_idle_tabs: int = int(os.getenv("ALITA_BROWSER_IDLE_TABS", "2"))
     ready_state_timeout: float = float(os.getenv("ALITA_READY_STATE_TIMEOUT", "20"))
     ready_state_target: str = os.getenv("ALITA_READY_STATE_TARGET", "complete")
+    max_sessions: int = max(1, int(os.getenv("ALITA_MAX_SESSIONS", "1024")))
     http_timeout: float = float(os.getenv("ALITA_HTTP_TIMEOUT", "20"))
+    http2: bool = _env_bool("ALITA_HTTP2", True)
+    http_max_connections: int = int(os.getenv("ALITA_HTTP_MAX_CONNECTIONS", "200"))
+    http_max_keepalive_connections: int = int(
+        os.getenv("ALITA_HTTP_MAX_KEEPALIVE_CONNECTIONS", "100")
+    )
+    http_keepalive_expiry: float = float(os.getenv("ALITA_HTTP_KEEPALIVE_EXPIRY", "30"))
 
 
 settings = Settings()
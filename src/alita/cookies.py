@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 from typing import Any, Iterable, Sequence
-from urllib.parse import urlparse
 
 import httpx
 from zendriver.cdp.network import Cookie as CdpCookie
 from zendriver.cdp.network import CookieParam
 
-from .models import CookieState
+from .models import CookieState, host_from_url
 
 
 def cookie_matches(cookie: CdpCookie, url: str) -> bool:
-    host = urlparse(url).hostname or ""
+    host = host_from_url(url)
     if not host:
         return True
     domain = cookie.domain.lstrip(".")
@@ -55,9 +54,8 @@ def cookie_state_to_param(cookie: CookieState, url: str) -> CookieParam:
 
 
 def merge_cookies(existing: Sequence[CookieState], updates: Sequence[CookieState]) -> list[CookieState]:
-    merged: dict[tuple[str, str, str], CookieState] = {cookie.key(): cookie for cookie in existing}
-    for cookie in updates:
-        merged[cookie.key()] = cookie
+    merged: dict[tuple[str, str, str], CookieState] = dict((cookie.key(), cookie) for cookie in existing)
+    merged.update((cookie.key(), cookie) for cookie in updates)
     return list(merged.values())
 
 
@@ -69,12 +67,11 @@ def cookies_for_request(cookies: Sequence[CookieState]) -> httpx.Cookies:
 
 
 def filter_cookie_states(cookies: Iterable[CookieState], url: str) -> list[CookieState]:
-    host = urlparse(url).hostname or ""
+    host = host_from_url(url)
     if not host:
         return list(cookies)
-    filtered: list[CookieState] = []
-    for cookie in cookies:
-        domain = (cookie.domain or host).lstrip(".")
-        if not domain or host == domain or host.endswith(f".{domain}"):
-            filtered.append(cookie)
-    return filtered
+    return [
+        cookie
+        for cookie in cookies
+        if host == cookie.normalized_domain or host.endswith(cookie.domain_suffix)
+    ]
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable
+from functools import lru_cache
 from typing import Any, Mapping
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 from pydantic import BaseModel, Field, HttpUrl, field_validator
 
@@ -17,20 +20,24 @@ class FetchRequest(BaseModel):
 
     @field_validator("browser_on_elements", mode="before")
     @classmethod
-    def _ensure_list(cls, value: Any) -> list[str]:
+    def _normalize_entries(cls, value: Any) -> list[Any]:
         if value is None:
             return []
         if isinstance(value, str):
-            return [value]
+            trimmed = value.strip()
+            return [trimmed] if trimmed else []
         if isinstance(value, Iterable):
-            return list(value)
+            # Non-string items are passed through so list[str] validation still rejects them.
+            entries: list[Any] = []
+            for item in value:
+                if isinstance(item, str):
+                    item = item.strip()
+                    if not item:
+                        continue
+                entries.append(item)
+            return entries
         raise TypeError("browser_on_elements must be a string or iterable of strings")
 
-    @field_validator("browser_on_elements")
-    @classmethod
-    def _strip_entries(cls, value: list[str]) -> list[str]:
-        return [item.strip() for item in value if isinstance(item, str) and item.strip()]
-
     @field_validator("wait_for_element")
     @classmethod
     def _strip_wait(cls, value: str | None) -> str | None:
@@ -40,7 +47,7 @@ class FetchRequest(BaseModel):
         return trimmed or None
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class CookieState:
     name: str
     value: str
@@ -49,11 +56,19 @@ class CookieState:
     secure: bool | None = None
     http_only: bool | None = None
     expires: float | None = None
+    normalized_domain: str = field(init=False, repr=False, compare=False)
+    # ".example.com" for subdomain matching; empty for host-only cookies, so it matches any host.
+    domain_suffix: str = field(init=False, repr=False, compare=False)
+    _key: tuple[str, str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        normalized_domain = (self.domain or "").lstrip(".")
+        object.__setattr__(self, "normalized_domain", normalized_domain)
+        object.__setattr__(self, "domain_suffix", f".{normalized_domain}" if normalized_domain else "")
+        object.__setattr__(self, "_key", (self.name, normalized_domain, self.path or "/"))
 
     def key(self) -> tuple[str, str, str]:
-        domain = (self.domain or "").lstrip(".")
-        path = self.path or "/"
-        return (self.name, domain, path)
+        return self._key
 
 
 @dataclass
@@ -62,21 +77,59 @@ class SessionState:
     cookies: list[CookieState] = field(default_factory=list)
     initialized: bool = False
     request_headers: dict[str, str] | None = None
+    sanitized_headers: dict[str, str] | None = None
+    in_use: int = 0
+
+
+SESSION_STORE_SHARDS = 64
 
 
 class SessionStore:
-    def __init__(self) -> None:
-        self._states: dict[str, SessionState] = {}
-        self._lock = asyncio.Lock()
+    def __init__(self, max_sessions: int) -> None:
+        self._states: OrderedDict[str, SessionState] = OrderedDict()
+        self._max_sessions = max_sessions
+        self._shards = [asyncio.Lock() for _ in range(SESSION_STORE_SHARDS)]
 
     async def get_state(self, domain: str) -> SessionState:
-        async with self._lock:
+        state = self._states.get(domain)
+        if state is not None:
+            self._states.move_to_end(domain)
+            return state
+        async with self._shards[hash(domain) & (SESSION_STORE_SHARDS - 1)]:
             state = self._states.get(domain)
             if state is None:
                 state = SessionState()
                 self._states[domain] = state
+                self._evict_overflow(domain)
             return state
 
+    @asynccontextmanager
+    async def session(self, domain: str) -> AsyncIterator[SessionState]:
+        state = await self.get_state(domain)
+        state.in_use += 1
+        try:
+            # asyncio.Lock.acquire() returns without suspending when uncontended, so
+            # there is no cheaper fast path to take here.
+            async with state.lock:
+                yield state
+        finally:
+            state.in_use -= 1
+
+    def _evict_overflow(self, keep: str) -> None:
+        # Sessions with requests holding or waiting on their lock are never evicted, so
+        # the store may briefly exceed max_sessions when every older entry is busy.
+        excess = len(self._states) - self._max_sessions
+        if excess <= 0:
+            return
+        victims: list[str] = []
+        for domain, state in self._states.items():
+            if domain != keep and not state.in_use:
+                victims.append(domain)
+                if len(victims) == excess:
+                    break
+        for domain in victims:
+            del self._states[domain]
+
 
 @dataclass
 class PlainSnapshot:
@@ -104,6 +157,10 @@ class BrowserResponseInfo:
 
 
 def domain_from_url(url: str) -> str:
-    parsed = urlparse(url)
-    host = parsed.hostname or parsed.netloc or ""
-    return host.lower()
+    # hostname is already lowercased; netloc is only consulted for host-less URLs.
+    return host_from_url(url) or urlsplit(url).netloc.lower()
+
+
+@lru_cache(maxsize=4096)
+def host_from_url(url: str) -> str:
+    return urlsplit(url).hostname or ""
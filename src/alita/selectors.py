@@ -5,15 +5,17 @@ from typing import Sequence
 from cssselect.parser import SelectorSyntaxError
 from fastapi import HTTPException
 from parsel import Selector
+from parsel.csstranslator import HTMLTranslator
 
-CLOUDFLARE_CHALLENGE_SELECTORS: tuple[str, ...] = (
-    "#challenge-running",
-    "#challenge-body-text",
-    "#challenge-stage",
-    "#cf-spinner-please-wait",
-    ".cf-browser-verification",
-    "form#challenge-form",
-    "div[data-translate='checking_browser']",
+# Each challenge selector is paired with a raw substring the markup must contain for it to match.
+CLOUDFLARE_CHALLENGE_SELECTORS: tuple[tuple[str, str], ...] = (
+    ("#challenge-running", "challenge-running"),
+    ("#challenge-body-text", "challenge-body-text"),
+    ("#challenge-stage", "challenge-stage"),
+    ("#cf-spinner-please-wait", "cf-spinner-please-wait"),
+    (".cf-browser-verification", "cf-browser-verification"),
+    ("form#challenge-form", "challenge-form"),
+    ("div[data-translate='checking_browser']", "checking_browser"),
 )
 
 CLOUDFLARE_TEXT_MARKERS: tuple[str, ...] = (
@@ -23,6 +25,12 @@ CLOUDFLARE_TEXT_MARKERS: tuple[str, ...] = (
     "just a moment"
 )
 
+_CLOUDFLARE_CHALLENGE_XPATHS: tuple[tuple[str, str], ...] = tuple(
+    (selector, HTMLTranslator().css_to_xpath(selector)) for selector, _ in CLOUDFLARE_CHALLENGE_SELECTORS
+)
+
+_CLOUDFLARE_SELECTOR_TOKENS: tuple[str, ...] = tuple(token for _, token in CLOUDFLARE_CHALLENGE_SELECTORS)
+
 
 def selector_exists(doc: Selector, selector: str, label: str) -> bool:
     try:
@@ -31,26 +39,34 @@ def selector_exists(doc: Selector, selector: str, label: str) -> bool:
         raise HTTPException(status_code=400, detail=f"Invalid CSS selector for {label}: {selector}") from exc
 
 
-def detect_cloudflare_challenge(doc: Selector) -> str | None:
-    for selector in CLOUDFLARE_CHALLENGE_SELECTORS:
-        if selector_exists(doc, selector, "cloudflare_challenge"):
+def _match_cloudflare_selector(doc: Selector) -> str | None:
+    for selector, xpath in _CLOUDFLARE_CHALLENGE_XPATHS:
+        if doc.xpath(xpath):
             return selector
-    text = (doc.xpath("string()").get() or "").lower()
-    for marker in CLOUDFLARE_TEXT_MARKERS:
-        if marker in text:
-            return marker
     return None
 
 
+def _match_cloudflare_text(html_lower: str) -> str | None:
+    # Scan the raw markup rather than materialising every text node via string().
+    return next((marker for marker in CLOUDFLARE_TEXT_MARKERS if marker in html_lower), None)
+
+
+def detect_cloudflare_challenge(doc: Selector, html: str) -> str | None:
+    return _match_cloudflare_selector(doc) or _match_cloudflare_text(html.lower())
+
+
 def detect_cloudflare_challenge_from_html(html: str) -> str | None:
-    doc = Selector(text=html)
-    return detect_cloudflare_challenge(doc)
+    html_lower = html.lower()
+    if any(token in html_lower for token in _CLOUDFLARE_SELECTOR_TOKENS):
+        marker = _match_cloudflare_selector(Selector(text=html))
+        if marker:
+            return marker
+    return _match_cloudflare_text(html_lower)
 
 
 def evaluate_plain_html(
-    html: str, wait_selector: str | None, browser_on: Sequence[str]
+    doc: Selector, html: str, wait_selector: str | None, browser_on: Sequence[str]
 ) -> tuple[bool, str | None, str | None]:
-    doc = Selector(text=html)
     wait_present = True
     if wait_selector:
         wait_present = selector_exists(doc, wait_selector, "wait_for_element")
@@ -58,5 +74,5 @@ def evaluate_plain_html(
         (selector for selector in browser_on if selector_exists(doc, selector, "browser_on_elements")),
         None,
     )
-    cloudflare_marker = detect_cloudflare_challenge(doc)
+    cloudflare_marker = detect_cloudflare_challenge(doc, html)
     return wait_present, block_selector, cloudflare_marker
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import base64
+import binascii
 import contextlib
 import logging
 from typing import Mapping
 
 import httpx
 from fastapi import HTTPException
+from parsel import Selector
 from zendriver import cdp
 from zendriver.cdp.fetch import HeaderEntry, RequestStage
 from zendriver.cdp.network import ResourceType
@@ -30,7 +31,7 @@ from .models import (
 )
 from .selectors import evaluate_plain_html, detect_cloudflare_challenge_from_html
 
-HOP_BY_HOP_HEADERS = {
+HOP_BY_HOP_HEADERS = frozenset({
     "host",
     "connection",
     "proxy-connection",
@@ -41,7 +42,7 @@ HOP_BY_HOP_HEADERS = {
     "te",
     "trailers",
     "transfer-encoding",
-}
+})
 
 logger = logging.getLogger(__name__)
 
@@ -49,24 +50,20 @@ CLOUDFLARE_POLL_SECONDS = 0.1
 
 
 def headers_from_httpx(headers: httpx.Headers) -> list[tuple[str, str]]:
-    return [(name, value) for name, value in headers.multi_items()]
+    # multi_items() already yields lowercased names.
+    return headers.multi_items()
 
 
 def headers_from_mapping(headers: Mapping[str, str]) -> list[tuple[str, str]]:
-    return [(name, value) for name, value in headers.items()]
+    return [(name.lower(), value) for name, value in headers.items()]
 
 
 def aggregate_headers(headers: list[tuple[str, str]]) -> list[dict[str, str]]:
-    return [{"name": name.lower(), "value": value} for name, value in headers]
+    return [{"name": name, "value": value} for name, value in headers]
 
 
 def sanitize_headers(headers: Mapping[str, str]) -> dict[str, str]:
-    sanitized = {}
-    for key, value in headers.items():
-        if key.lower() in HOP_BY_HOP_HEADERS:
-            continue
-        sanitized[key] = value
-    return sanitized
+    return {key: value for key, value in headers.items() if key.lower() not in HOP_BY_HOP_HEADERS}
 
 
 def extract_user_agent(headers: Mapping[str, str]) -> str | None:
@@ -109,49 +106,52 @@ async def wait_for_cloudflare_clearance(tab: Tab, url: str, timeout: float) -> N
 
 
 async def await_rendered_html(tab: Tab, payload: FetchRequest, settings: Settings) -> str:
-    ready_timeout = max(payload.wait_timeout, settings.ready_state_timeout)
+    wait_selector = payload.wait_for_element
+    wait_timeout = payload.wait_timeout
+    ready_target = settings.ready_state_target
+    ready_timeout = max(wait_timeout, settings.ready_state_timeout)
     target_url = str(payload.url)
-    await wait_for_cloudflare_clearance(tab, target_url, payload.wait_timeout)
-    if payload.wait_for_element:
+    await wait_for_cloudflare_clearance(tab, target_url, wait_timeout)
+    if wait_selector:
         logger.debug(
             "Waiting for selector '%s' on %s (timeout %.1fs)",
-            payload.wait_for_element,
+            wait_selector,
             target_url,
-            payload.wait_timeout,
+            wait_timeout,
         )
         try:
             await asyncio.wait_for(
-                tab.wait_for(selector=payload.wait_for_element, timeout=payload.wait_timeout),
-                timeout=payload.wait_timeout,
+                tab.wait_for(selector=wait_selector, timeout=wait_timeout),
+                timeout=wait_timeout,
             )
         except asyncio.TimeoutError as exc:
             logger.warning(
                 "Timed out waiting for selector '%s' on %s after %.1fs",
-                payload.wait_for_element,
+                wait_selector,
                 target_url,
-                payload.wait_timeout,
+                wait_timeout,
             )
             raise HTTPException(status_code=504, detail="Timed out waiting for wait_for_element") from exc
     logger.debug(
         "Waiting for ready state '%s' on %s (timeout %.1fs)",
-        settings.ready_state_target,
+        ready_target,
         target_url,
         ready_timeout,
     )
     try:
         await asyncio.wait_for(
-            tab.wait_for_ready_state(settings.ready_state_target, timeout=int(ready_timeout)),
+            tab.wait_for_ready_state(ready_target, timeout=int(ready_timeout)),
             timeout=ready_timeout,
         )
     except asyncio.TimeoutError as exc:
         logger.warning(
             "Timed out waiting for ready state '%s' on %s after %.1fs",
-            settings.ready_state_target,
+            ready_target,
             target_url,
             ready_timeout,
         )
         raise HTTPException(status_code=504, detail="Timed out waiting for ready state") from exc
-    logger.debug("Ready state '%s' satisfied on %s", settings.ready_state_target, target_url)
+    logger.debug("Ready state '%s' satisfied on %s", ready_target, target_url)
     html = await tab.get_content()
     logger.debug("Rendered HTML ready for %s (length=%d)", target_url, len(html))
     return html
@@ -162,7 +162,8 @@ async def hydrate_with_snapshot(tab: Tab, url: str, snapshot: PlainSnapshot) ->
         await tab.send(cdp.page.navigate(url))
         await interception.response_future
         header_entries = [HeaderEntry(name=name, value=value) for name, value in snapshot.headers]
-        body_b64 = base64.b64encode(snapshot.body).decode("ascii")
+        # CDP's Fetch.fulfillRequest only accepts a base64 string body.
+        body_b64 = binascii.b2a_base64(snapshot.body, newline=False).decode("ascii")
         await interception.fulfill_request(
             response_code=snapshot.status_code,
             response_headers=header_entries,
@@ -177,14 +178,15 @@ async def capture_browser_navigation(
 ) -> BrowserResponseInfo:
     """Capture the final top-level Document response for the current navigation."""
 
-    request_headers_map: dict[cdp.network.RequestId, dict[str, str]] = {}
+    request_headers_map: dict[cdp.network.RequestId, Mapping[str, str]] = {}
     document_available = asyncio.Event()
-    document_events: list[tuple[cdp.page.FrameId, int, list[tuple[str, str]], dict[str, str]]] = []
+    document_events: list[tuple[cdp.page.FrameId, int, list[tuple[str, str]], Mapping[str, str]]] = []
 
     async def handle_request(event: cdp.network.RequestWillBeSent) -> None:
         if event.type_ != ResourceType.DOCUMENT:
             return
-        request_headers_map[event.request_id] = dict(event.request.headers)
+        # Only popped once when the response arrives, so the event's mapping is kept as-is.
+        request_headers_map[event.request_id] = event.request.headers
 
     async def handle_response(event: cdp.network.ResponseReceived) -> None:
         if event.type_ != ResourceType.DOCUMENT:
@@ -208,7 +210,7 @@ async def capture_browser_navigation(
         await document_available.wait()
         await page_ready.wait()
 
-        selected: tuple[cdp.page.FrameId, int, list[tuple[str, str]], dict[str, str]] | None = None
+        selected: tuple[cdp.page.FrameId, int, list[tuple[str, str]], Mapping[str, str]] | None = None
         for entry in reversed(document_events):
             if entry[0] == frame_id:
                 selected = entry
@@ -236,7 +238,7 @@ async def browser_flow(
     snapshot: PlainSnapshot | None = None,
 ) -> PageResult:
     url = str(payload.url)
-    logger.info(
+    logger.debug(
         "Using browser pipeline for %s (%s)",
         domain,
         "snapshot replay" if snapshot else "live navigation",
@@ -311,7 +313,7 @@ async def browser_flow(
         cookies = await manager.export_cookies(url)
         logger.debug("Exported %d cookies after browser run for %s", len(cookies), domain)
     filtered_cookies = filter_cookie_states(cookies, url)
-    logger.info(
+    logger.debug(
         "Browser pipeline complete for %s (status %s, used_browser=True)",
         domain,
         response_info.status_code,
@@ -321,7 +323,7 @@ async def browser_flow(
         headers=response_info.headers,
         body=html,
         used_browser=True,
-        request_headers=dict(effective_headers),
+        request_headers=effective_headers,
         cookies=filtered_cookies,
     )
 
@@ -340,7 +342,10 @@ async def plain_flow(
         logger.info("No stored headers for %s; falling back to browser immediately", domain)
         return await browser_flow(payload, state, domain, pool, settings)
 
-    headers = sanitize_headers(state.request_headers)
+    headers = state.sanitized_headers
+    if headers is None:
+        headers = sanitize_headers(state.request_headers)
+        state.sanitized_headers = headers
     cookies = cookies_for_request(state.cookies)
     try:
         response = await client.get(url, headers=headers, cookies=cookies)
@@ -353,9 +358,16 @@ async def plain_flow(
     merged_cookies = merge_cookies(state.cookies, cookie_updates)
     filtered_cookies = filter_cookie_states(merged_cookies, url)
 
-    wait_present, blocking_selector, cloudflare_marker = evaluate_plain_html(
-        response.text, payload.wait_for_element, payload.browser_on_elements
-    )
+    text = response.text
+    if payload.wait_for_element or payload.browser_on_elements:
+        doc = Selector(text=text)
+        wait_present, blocking_selector, cloudflare_marker = evaluate_plain_html(
+            doc, text, payload.wait_for_element, payload.browser_on_elements
+        )
+    else:
+        # Nothing to match against; only parse if the raw markup looks like a challenge.
+        wait_present, blocking_selector = True, None
+        cloudflare_marker = detect_cloudflare_challenge_from_html(text)
     fallback = False
     if payload.wait_for_element and not wait_present:
         logger.info(
@@ -392,7 +404,7 @@ async def plain_flow(
     return PageResult(
         status_code=response.status_code,
         headers=header_list,
-        body=response.text,
+        body=text,
         used_browser=False,
         request_headers=state.request_headers,
         cookies=filtered_cookies,